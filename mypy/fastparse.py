@@ -1,9 +1,11 @@
 import copy
+import functools
+import itertools
 import re
 import sys
 import typing  # for typing.Type, which conflicts with types.Type
 import warnings
-from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union, cast
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, TypeVar, Union, cast
 
 from typing_extensions import Final, Literal, overload
 
@@ -120,6 +122,9 @@ try:
     # pull this into a final variable to make mypyc be quiet about the
     # the default argument warning
     PY_MINOR_VERSION: Final = sys.version_info[1]
+    # Used where a sys.version_info check must not be resolved statically (so that
+    # mypyc compiles both branches); evaluated once rather than on every use
+    IS_PY38_OR_EARLIER: Final = sys.version_info < (3, 9)
 
     # Check if we can use the stdlib ast module instead of typed_ast.
     if sys.version_info >= (3, 8):
@@ -249,6 +254,12 @@ INVALID_TYPE_IGNORE: Final = 'Invalid "type: ignore" comment'
 
 TYPE_IGNORE_PATTERN: Final = re.compile(r"[^#]*#\s*type:\s*ignore\s*(.*)")
 
+# Tag after "# type: ignore" that ignores all errors (blank or just a comment)
+EMPTY_TYPE_IGNORE_TAG_PATTERN: Final = re.compile(r"\s*(#.*)?", re.DOTALL)
+
+# Tag after "# type: ignore" listing error codes, e.g. "[code1, code2]  # comment"
+TYPE_IGNORE_TAG_PATTERN: Final = re.compile(r"\s*\[([^]#]*)\]\s*(#.*)?")
+
 
 def parse(
     source: Union[str, bytes],
@@ -286,9 +297,7 @@ def parse(
         tree.path = fnam
         tree.is_stub = is_stub_file
     except SyntaxError as e:
-        # alias to please mypyc
-        is_py38_or_earlier = sys.version_info < (3, 9)
-        if is_py38_or_earlier and e.filename == "<fstring>":
+        if IS_PY38_OR_EARLIER and e.filename == "<fstring>":
             # In Python 3.8 and earlier, syntax errors in f-strings have lineno relative to the
             # start of the f-string. This would be misleading, as mypy will report the error as the
             # lineno within the file.
@@ -320,14 +329,39 @@ def parse_type_ignore_tag(tag: Optional[str]) -> Optional[List[str]]:
      * list of ignored error codes if a tag was found
      * None if the tag was invalid.
     """
-    if not tag or tag.strip() == "" or tag.strip().startswith("#"):
+    if not tag or EMPTY_TYPE_IGNORE_TAG_PATTERN.fullmatch(tag):
         # No tag -- ignore all errors.
         return []
-    m = re.match(r"\s*\[([^]#]*)\]\s*(#.*)?$", tag)
-    if m is None:
+    error_codes = parse_type_ignore_codes(tag)
+    if error_codes is None:
         # Invalid "# type: ignore" comment.
         return None
-    return [code.strip() for code in m.group(1).split(",")]
+    return list(error_codes)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_type_ignore_codes(tag: str) -> Optional[Tuple[str, ...]]:
+    """Parse a "[code, ...]" tag into error codes (None if the tag is invalid).
+
+    The same few tags are used over and over, so results are cached. They are
+    returned as tuples so that cached values can't be mutated by callers.
+    """
+    m = TYPE_IGNORE_TAG_PATTERN.fullmatch(tag)
+    if m is None:
+        return None
+    return tuple(code.strip() for code in m.group(1).split(","))
+
+
+# The cached tree is shared by every caller that parses the same text, so it is
+# read-only: TypeConverter must copy any node it needs to adjust.
+@functools.lru_cache(maxsize=4096)
+def parse_type_comment_ast(type_comment: str) -> AST:
+    """Parse the text of a type comment or string annotation into an AST.
+
+    The same few type comments (and forward references) tend to be repeated many
+    times, so the result is cached. Callers must not mutate the returned tree.
+    """
+    return ast3_parse(type_comment, "<type_comment>", "eval")
 
 
 def parse_type_comment(
@@ -338,10 +372,10 @@ def parse_type_comment(
     Return (ignore info, parsed type).
     """
     try:
-        typ = ast3_parse(type_comment, "<type_comment>", "eval")
+        typ = parse_type_comment_ast(type_comment)
     except SyntaxError:
         if errors is not None:
-            stripped_type = type_comment.split("#", 2)[0].strip()
+            stripped_type = type_comment.partition("#")[0].strip()
             err_msg = f'{TYPE_COMMENT_SYNTAX_ERROR} "{stripped_type}"'
             errors.report(line, column, err_msg, blocker=True, code=codes.SYNTAX)
             return None, None
@@ -392,15 +426,28 @@ def parse_type_string(
 
 
 def is_no_type_check_decorator(expr: ast3.expr) -> bool:
-    if isinstance(expr, Name):
+    # The parser only creates exact node classes, so a type identity test suffices
+    if type(expr) is Name:
         return expr.id == "no_type_check"
-    elif isinstance(expr, Attribute):
-        if isinstance(expr.value, Name):
-            return expr.value.id == "typing" and expr.attr == "no_type_check"
+    elif type(expr) is Attribute:
+        value = expr.value
+        if type(value) is Name:
+            return expr.attr == "no_type_check" and value.id == "typing"
     return False
 
 
 class ASTConverter:
+    __slots__ = (
+        "class_and_function_stack",
+        "imports",
+        "options",
+        "is_stub",
+        "errors",
+        "type_ignores",
+        "min_type_ignore_line",
+        "shared_type_converter",
+    )
+
     def __init__(self, options: Options, is_stub: bool, errors: Errors) -> None:
         # 'C' for class, 'F' for function
         self.class_and_function_stack: List[Literal["C", "F"]] = []
@@ -411,13 +458,26 @@ class ASTConverter:
         self.errors = errors
 
         self.type_ignores: Dict[int, List[str]] = {}
+        # Smallest line number in type_ignores (sys.maxsize if there are none)
+        self.min_type_ignore_line = sys.maxsize
 
-        # Cache of visit_X methods keyed by type of visited object
-        self.visitor_cache: Dict[type, Callable[[Optional[AST]], Any]] = {}
+        # Reused for all annotations and signature type comments; see type_converter()
+        self.shared_type_converter = TypeConverter(errors)
 
     def note(self, msg: str, line: int, column: int) -> None:
         self.errors.report(line, column, msg, severity="note", code=codes.SYNTAX)
 
+    def type_converter(self, line: int, override_column: int = -1) -> "TypeConverter":
+        """Return the shared TypeConverter, set up to convert a type at the given line.
+
+        TypeConverter keeps no state between top-level visit() calls, and never calls
+        back into this converter, so a single instance can be reused.
+        """
+        converter = self.shared_type_converter
+        converter.line = line
+        converter.override_column = override_column
+        return converter
+
     def fail(
         self,
         msg: str,
@@ -441,31 +501,33 @@ class ASTConverter:
     def visit(self, node: Optional[AST]) -> Any:
         if node is None:
             return None
-        typeobj = type(node)
-        visitor = self.visitor_cache.get(typeobj)
+        visitor = _AST_VISITORS.get(type(node))
         if visitor is None:
-            method = "visit_" + node.__class__.__name__
-            visitor = getattr(self, method)
-            self.visitor_cache[typeobj] = visitor
-        return visitor(node)
+            return getattr(self, "visit_" + node.__class__.__name__)(node)
+        return visitor(self, node)
 
     def set_line(self, node: N, n: AstNode) -> N:
         node.line = n.lineno
         node.column = n.col_offset
-        node.end_line = getattr(n, "end_lineno", None)
-        node.end_column = getattr(n, "end_col_offset", None)
+        if sys.version_info >= (3, 8):
+            # End positions are always present in 3.8+ (mypy and mypyc resolve this
+            # check statically, so there is no run time cost)
+            node.end_line = n.end_lineno
+            node.end_column = n.end_col_offset
+        else:
+            node.end_line = None
+            node.end_column = None
 
         return node
 
     def translate_opt_expr_list(self, l: Sequence[Optional[AST]]) -> List[Optional[Expression]]:
-        res: List[Optional[Expression]] = []
-        for e in l:
-            exp = self.visit(e)
-            res.append(exp)
-        return res
+        return [self.visit(e) for e in l]
 
     def translate_expr_list(self, l: Sequence[AST]) -> List[Expression]:
-        return cast(List[Expression], self.translate_opt_expr_list(l))
+        # Every expression node class has a visitor, and items are never None here,
+        # so we can skip the checks done by visit().
+        visitors = _AST_VISITORS
+        return [visitors[type(e)](self, e) for e in l]
 
     def get_lineno(self, node: Union[ast3.expr, ast3.stmt]) -> int:
         if (
@@ -480,24 +542,22 @@ class ASTConverter:
     ) -> List[Statement]:
         # A "# type: ignore" comment before the first statement of a module
         # ignores the whole module:
-        if (
-            ismodule
-            and stmts
-            and self.type_ignores
-            and min(self.type_ignores) < self.get_lineno(stmts[0])
-        ):
-            self.errors.used_ignored_lines[self.errors.file][min(self.type_ignores)].append(
-                codes.FILE.code
-            )
-            block = Block(self.fix_function_overloads(self.translate_stmt_list(stmts)))
-            mark_block_unreachable(block)
-            return [block]
+        module_ignore_line: Optional[int] = None
+        if ismodule and stmts and self.min_type_ignore_line < self.get_lineno(stmts[0]):
+            module_ignore_line = self.min_type_ignore_line
 
         res: List[Statement] = []
         for stmt in stmts:
             node = self.visit(stmt)
             res.append(node)
 
+        if module_ignore_line is not None:
+            self.errors.used_ignored_lines[self.errors.file][module_ignore_line].append(
+                codes.FILE.code
+            )
+            block = Block(self.fix_function_overloads(res))
+            mark_block_unreachable(block)
+            return [block]
         return res
 
     def translate_type_comment(
@@ -509,9 +569,14 @@ class ASTConverter:
             lineno = n.lineno
             extra_ignore, typ = parse_type_comment(type_comment, lineno, n.col_offset, self.errors)
             if extra_ignore is not None:
-                self.type_ignores[lineno] = extra_ignore
+                self.add_type_ignore(lineno, extra_ignore)
             return typ
 
+    def add_type_ignore(self, line: int, ignored: List[str]) -> None:
+        self.type_ignores[line] = ignored
+        if line < self.min_type_ignore_line:
+            self.min_type_ignore_line = line
+
     op_map: Final[Dict[typing.Type[AST], str]] = {
         ast3.Add: "+",
         ast3.Sub: "-",
@@ -555,6 +620,15 @@ class ASTConverter:
         else:
             return op_name
 
+    unary_op_map: Final[Dict[typing.Type[AST], str]] = {
+        ast3.Invert: "~",
+        ast3.Not: "not",
+        ast3.UAdd: "+",
+        ast3.USub: "-",
+    }
+
+    bool_op_map: Final[Dict[typing.Type[AST], str]] = {ast3.And: "and", ast3.Or: "or"}
+
     def as_block(self, stmts: List[ast3.stmt], lineno: int) -> Optional[Block]:
         b = None
         if stmts:
@@ -580,11 +654,13 @@ class ASTConverter:
         last_if_stmt_overload_name: Optional[str] = None
         last_if_unknown_truth_value: Optional[IfStmt] = None
         skipped_if_stmts: List[IfStmt] = []
+        # None of the statement classes checked below have subclasses, so the exact
+        # type checks are equivalent to (slower) isinstance checks.
         for stmt in stmts:
             if_overload_name: Optional[str] = None
             if_block_with_overload: Optional[Block] = None
             if_unknown_truth_value: Optional[IfStmt] = None
-            if isinstance(stmt, IfStmt) and seen_unconditional_func_def is False:
+            if type(stmt) is IfStmt and seen_unconditional_func_def is False:
                 # Check IfStmt block to determine if function overloads can be merged
                 if_overload_name = self._check_ifstmt_for_overloads(stmt, current_overload_name)
                 if if_overload_name is not None:
@@ -595,7 +671,7 @@ class ASTConverter:
 
             if (
                 current_overload_name is not None
-                and isinstance(stmt, (Decorator, FuncDef))
+                and (type(stmt) is Decorator or type(stmt) is FuncDef)
                 and stmt.name == current_overload_name
             ):
                 if last_if_stmt is not None:
@@ -612,11 +688,11 @@ class ASTConverter:
                     self.fail_merge_overload(last_if_unknown_truth_value)
                     last_if_unknown_truth_value = None
                 current_overload.append(stmt)
-                if isinstance(stmt, FuncDef):
+                if type(stmt) is FuncDef:
                     seen_unconditional_func_def = True
             elif (
                 current_overload_name is not None
-                and isinstance(stmt, IfStmt)
+                and type(stmt) is IfStmt
                 and if_overload_name == current_overload_name
             ):
                 # IfStmt only contains stmts relevant to current_overload.
@@ -672,10 +748,10 @@ class ASTConverter:
                 # related, but multiple underscore functions next to each other aren't necessarily
                 # related
                 seen_unconditional_func_def = False
-                if isinstance(stmt, Decorator) and not unnamed_function(stmt.name):
+                if type(stmt) is Decorator and not unnamed_function(stmt.name):
                     current_overload = [stmt]
                     current_overload_name = stmt.name
-                elif isinstance(stmt, IfStmt) and if_overload_name is not None:
+                elif if_overload_name is not None and type(stmt) is IfStmt:
                     current_overload = []
                     current_overload_name = if_overload_name
                     last_if_stmt = stmt
@@ -819,7 +895,8 @@ class ASTConverter:
         return self._is_stripped_if_stmt(stmt.else_body.body[0])
 
     def in_method_scope(self) -> bool:
-        return self.class_and_function_stack[-2:] == ["C", "F"]
+        stack = self.class_and_function_stack
+        return len(stack) >= 2 and stack[-1] == "F" and stack[-2] == "C"
 
     def translate_module_id(self, id: str) -> str:
         """Return the actual, internal module id for a source text id."""
@@ -829,10 +906,11 @@ class ASTConverter:
 
     def visit_Module(self, mod: ast3.Module) -> MypyFile:
         self.type_ignores = {}
+        self.min_type_ignore_line = sys.maxsize
         for ti in mod.type_ignores:
             parsed = parse_type_ignore_tag(ti.tag)  # type: ignore[attr-defined]
             if parsed is not None:
-                self.type_ignores[ti.lineno] = parsed
+                self.add_type_ignore(ti.lineno, parsed)
             else:
                 self.fail(INVALID_TYPE_IGNORE, ti.lineno, -1)
         body = self.fix_function_overloads(self.translate_stmt_list(mod.body, ismodule=True))
@@ -856,9 +934,11 @@ class ASTConverter:
     ) -> Union[FuncDef, Decorator]:
         """Helper shared between visit_FunctionDef and visit_AsyncFunctionDef."""
         self.class_and_function_stack.append("F")
-        no_type_check = bool(
-            n.decorator_list and any(is_no_type_check_decorator(d) for d in n.decorator_list)
-        )
+        no_type_check = False
+        for d in n.decorator_list:
+            if is_no_type_check_decorator(d):
+                no_type_check = True
+                break
 
         lineno = n.lineno
         args = self.transform_args(n.args, lineno, no_type_check=no_type_check)
@@ -894,23 +974,23 @@ class ASTConverter:
                     # PEP 484 disallows both type annotations and type comments
                     if n.returns or any(a.type_annotation is not None for a in args):
                         self.fail(message_registry.DUPLICATE_TYPE_SIGNATURES, lineno, n.col_offset)
-                    translated_args = TypeConverter(
-                        self.errors, line=lineno, override_column=n.col_offset
+                    translated_args = self.type_converter(
+                        lineno, override_column=n.col_offset
                     ).translate_expr_list(func_type_ast.argtypes)
                     arg_types = [
                         a if a is not None else AnyType(TypeOfAny.unannotated)
                         for a in translated_args
                     ]
-                return_type = TypeConverter(self.errors, line=lineno).visit(func_type_ast.returns)
+                return_type = self.type_converter(lineno).visit(func_type_ast.returns)
 
                 # add implicit self type
                 if self.in_method_scope() and len(arg_types) < len(args):
                     arg_types.insert(0, AnyType(TypeOfAny.special_form))
             except SyntaxError:
-                stripped_type = n.type_comment.split("#", 2)[0].strip()
+                stripped_type = n.type_comment.partition("#")[0].strip()
                 err_msg = f'{TYPE_COMMENT_SYNTAX_ERROR} "{stripped_type}"'
                 self.fail(err_msg, lineno, n.col_offset)
-                if n.type_comment and n.type_comment[0] not in ["(", "#"]:
+                if n.type_comment and n.type_comment[0] not in ("(", "#"):
                     self.note(
                         "Suggestion: wrap argument types in parentheses", lineno, n.col_offset
                     )
@@ -918,16 +998,23 @@ class ASTConverter:
                 return_type = AnyType(TypeOfAny.from_error)
         else:
             arg_types = [a.type_annotation for a in args]
-            return_type = TypeConverter(
-                self.errors, line=n.returns.lineno if n.returns else lineno
-            ).visit(n.returns)
+            returns_line = n.returns.lineno if n.returns else lineno
+            return_type = self.type_converter(returns_line).visit(n.returns)
 
         for arg, arg_type in zip(args, arg_types):
             self.set_type_optional(arg_type, arg.initializer)
 
+        has_arg_types = False
+        has_ellipsis = False
+        for t in arg_types:
+            if t is not None:
+                has_arg_types = True
+                if isinstance(t, EllipsisType):
+                    has_ellipsis = True
+
         func_type = None
-        if any(arg_types) or return_type:
-            if len(arg_types) != 1 and any(isinstance(t, EllipsisType) for t in arg_types):
+        if has_arg_types or return_type:
+            if len(arg_types) != 1 and has_ellipsis:
                 self.fail(
                     "Ellipses cannot accompany other argument types " "in function type signature",
                     lineno,
@@ -951,16 +1038,18 @@ class ASTConverter:
                 )
 
         # End position is always the same.
-        end_line = getattr(n, "end_lineno", None)
-        end_column = getattr(n, "end_col_offset", None)
+        end_line: Optional[int] = None
+        end_column: Optional[int] = None
+        if sys.version_info >= (3, 8):
+            end_line = n.end_lineno
+            end_column = n.end_col_offset
 
         func_def = FuncDef(n.name, args, self.as_required_block(n.body, lineno), func_type)
-        if isinstance(func_def.type, CallableType):
-            # semanal.py does some in-place modifications we want to avoid
-            func_def.unanalyzed_type = func_def.type.copy_modified()
         if is_coroutine:
             func_def.is_coroutine = True
         if func_type is not None:
+            # semanal.py does some in-place modifications we want to avoid
+            func_def.unanalyzed_type = func_type.copy_modified()
             func_type.definition = func_def
             func_type.line = lineno
 
@@ -1011,19 +1100,18 @@ class ASTConverter:
         new_args = []
         names: List[ast3.arg] = []
         posonlyargs = getattr(args, "posonlyargs", cast(List[ast3.arg], []))
-        args_args = posonlyargs + args.args
+        num_posonly = len(posonlyargs)
         args_defaults = args.defaults
-        num_no_defaults = len(args_args) - len(args_defaults)
-        # positional arguments without defaults
-        for i, a in enumerate(args_args[:num_no_defaults]):
-            pos_only = i < len(posonlyargs)
-            new_args.append(self.make_argument(a, None, ARG_POS, no_type_check, pos_only))
-            names.append(a)
-
-        # positional arguments with defaults
-        for i, (a, d) in enumerate(zip(args_args[num_no_defaults:], args_defaults)):
-            pos_only = num_no_defaults + i < len(posonlyargs)
-            new_args.append(self.make_argument(a, d, ARG_OPT, no_type_check, pos_only))
+        num_no_defaults = num_posonly + len(args.args) - len(args_defaults)
+        # positional arguments (defaults belong to the last len(args_defaults) of them)
+        for i, a in enumerate(itertools.chain(posonlyargs, args.args)):
+            pos_only = i < num_posonly
+            if i < num_no_defaults:
+                arg = self.make_argument(a, None, ARG_POS, no_type_check, pos_only)
+            else:
+                d = args_defaults[i - num_no_defaults]
+                arg = self.make_argument(a, d, ARG_OPT, no_type_check, pos_only)
+            new_args.append(arg)
             names.append(a)
 
         # *arg
@@ -1066,13 +1154,14 @@ class ASTConverter:
                 self.fail(message_registry.DUPLICATE_TYPE_SIGNATURES, arg.lineno, arg.col_offset)
             arg_type = None
             if annotation is not None:
-                arg_type = TypeConverter(self.errors, line=arg.lineno).visit(annotation)
+                arg_type = self.type_converter(arg.lineno).visit(annotation)
             else:
                 arg_type = self.translate_type_comment(arg, type_comment)
         if argument_elide_name(arg.arg):
             pos_only = True
 
-        return Argument(Var(arg.arg), arg_type, self.visit(default), kind, pos_only)
+        initializer = None if default is None else self.visit(default)
+        return Argument(Var(arg.arg), arg_type, initializer, kind, pos_only)
 
     def fail_arg(self, msg: str, arg: ast3.arg) -> None:
         self.fail(msg, arg.lineno, arg.col_offset)
@@ -1104,14 +1193,15 @@ class ASTConverter:
             cdef.line = n.lineno
             cdef.deco_line = n.decorator_list[0].lineno if n.decorator_list else None
         cdef.column = n.col_offset
-        cdef.end_line = getattr(n, "end_lineno", None)
-        cdef.end_column = getattr(n, "end_col_offset", None)
+        if sys.version_info >= (3, 8):
+            cdef.end_line = n.end_lineno
+            cdef.end_column = n.end_col_offset
         self.class_and_function_stack.pop()
         return cdef
 
     # Return(expr? value)
     def visit_Return(self, n: ast3.Return) -> ReturnStmt:
-        node = ReturnStmt(self.visit(n.value))
+        node = ReturnStmt(None if n.value is None else self.visit(n.value))
         return self.set_line(node, n)
 
     # Delete(expr* targets)
@@ -1141,7 +1231,7 @@ class ASTConverter:
             rvalue.column = n.col_offset
         else:
             rvalue = self.visit(n.value)
-        typ = TypeConverter(self.errors, line=line).visit(n.annotation)
+        typ = self.type_converter(line).visit(n.annotation)
         assert typ is not None
         typ.column = n.annotation.col_offset
         s = AssignmentStmt([self.visit(n.target)], rvalue, type=typ, new_syntax=True)
@@ -1203,7 +1293,7 @@ class ASTConverter:
         target_type = self.translate_type_comment(n, n.type_comment)
         node = WithStmt(
             [self.visit(i.context_expr) for i in n.items],
-            [self.visit(i.optional_vars) for i in n.items],
+            [None if i.optional_vars is None else self.visit(i.optional_vars) for i in n.items],
             self.as_required_block(n.body, n.lineno),
             target_type,
         )
@@ -1214,7 +1304,7 @@ class ASTConverter:
         target_type = self.translate_type_comment(n, n.type_comment)
         s = WithStmt(
             [self.visit(i.context_expr) for i in n.items],
-            [self.visit(i.optional_vars) for i in n.items],
+            [None if i.optional_vars is None else self.visit(i.optional_vars) for i in n.items],
             self.as_required_block(n.body, n.lineno),
             target_type,
         )
@@ -1223,7 +1313,10 @@ class ASTConverter:
 
     # Raise(expr? exc, expr? cause)
     def visit_Raise(self, n: ast3.Raise) -> RaiseStmt:
-        node = RaiseStmt(self.visit(n.exc), self.visit(n.cause))
+        node = RaiseStmt(
+            None if n.exc is None else self.visit(n.exc),
+            None if n.cause is None else self.visit(n.cause),
+        )
         return self.set_line(node, n)
 
     # Try(stmt* body, excepthandler* handlers, stmt* orelse, stmt* finalbody)
@@ -1231,7 +1324,7 @@ class ASTConverter:
         vs = [
             self.set_line(NameExpr(h.name), h) if h.name is not None else None for h in n.handlers
         ]
-        types = [self.visit(h.type) for h in n.handlers]
+        types = [None if h.type is None else self.visit(h.type) for h in n.handlers]
         handlers = [self.as_required_block(h.body, h.lineno) for h in n.handlers]
 
         node = TryStmt(
@@ -1246,7 +1339,7 @@ class ASTConverter:
 
     # Assert(expr test, expr? msg)
     def visit_Assert(self, n: ast3.Assert) -> AssertStmt:
-        node = AssertStmt(self.visit(n.test), self.visit(n.msg))
+        node = AssertStmt(self.visit(n.test), None if n.msg is None else self.visit(n.msg))
         return self.set_line(node, n)
 
     # Import(alias* names)
@@ -1321,46 +1414,28 @@ class ASTConverter:
     def visit_BoolOp(self, n: ast3.BoolOp) -> OpExpr:
         # mypy translates (1 and 2 and 3) as (1 and (2 and 3))
         assert len(n.values) >= 2
-        op_node = n.op
-        if isinstance(op_node, ast3.And):
-            op = "and"
-        elif isinstance(op_node, ast3.Or):
-            op = "or"
-        else:
+        op = ASTConverter.bool_op_map.get(type(n.op))
+        if op is None:
             raise RuntimeError("unknown BoolOp " + str(type(n)))
 
-        # potentially inefficient!
         return self.group(op, self.translate_expr_list(n.values), n)
 
     def group(self, op: str, vals: List[Expression], n: ast3.expr) -> OpExpr:
-        if len(vals) == 2:
-            e = OpExpr(op, vals[0], vals[1])
-        else:
-            e = OpExpr(op, vals[0], self.group(op, vals[1:], n))
-        return self.set_line(e, n)
+        # Fold right to left, starting from the innermost (last) pair of operands
+        e = self.set_line(OpExpr(op, vals[-2], vals[-1]), n)
+        for i in range(len(vals) - 3, -1, -1):
+            e = self.set_line(OpExpr(op, vals[i], e), n)
+        return e
 
     # BinOp(expr left, operator op, expr right)
     def visit_BinOp(self, n: ast3.BinOp) -> OpExpr:
         op = self.from_operator(n.op)
-
-        if op is None:
-            raise RuntimeError("cannot translate BinOp " + str(type(n.op)))
-
         e = OpExpr(op, self.visit(n.left), self.visit(n.right))
         return self.set_line(e, n)
 
     # UnaryOp(unaryop op, expr operand)
     def visit_UnaryOp(self, n: ast3.UnaryOp) -> UnaryExpr:
-        op = None
-        if isinstance(n.op, ast3.Invert):
-            op = "~"
-        elif isinstance(n.op, ast3.Not):
-            op = "not"
-        elif isinstance(n.op, ast3.UAdd):
-            op = "+"
-        elif isinstance(n.op, ast3.USub):
-            op = "-"
-
+        op = ASTConverter.unary_op_map.get(type(n.op))
         if op is None:
             raise RuntimeError("cannot translate UnaryOp " + str(type(n.op)))
 
@@ -1372,6 +1447,11 @@ class ASTConverter:
         body = ast3.Return(n.body)
         body.lineno = n.body.lineno
         body.col_offset = n.body.col_offset
+        if sys.version_info >= (3, 8):
+            # set_line reads these directly, and on 3.8 unset optional attributes
+            # raise AttributeError; the synthesized Return has no end position
+            body.end_lineno = None
+            body.end_col_offset = None
 
         e = LambdaExpr(
             self.transform_args(n.args, n.lineno), self.as_required_block([body], n.lineno)
@@ -1408,10 +1488,15 @@ class ASTConverter:
 
     # DictComp(expr key, expr value, comprehension* generators)
     def visit_DictComp(self, n: ast3.DictComp) -> DictionaryComprehension:
-        targets = [self.visit(c.target) for c in n.generators]
-        iters = [self.visit(c.iter) for c in n.generators]
-        ifs_list = [self.translate_expr_list(c.ifs) for c in n.generators]
-        is_async = [bool(c.is_async) for c in n.generators]
+        targets: List[Expression] = []
+        iters: List[Expression] = []
+        ifs_list: List[List[Expression]] = []
+        is_async: List[bool] = []
+        for c in n.generators:
+            targets.append(self.visit(c.target))
+            iters.append(self.visit(c.iter))
+            ifs_list.append(self.translate_expr_list(c.ifs))
+            is_async.append(bool(c.is_async))
         e = DictionaryComprehension(
             self.visit(n.key), self.visit(n.value), targets, iters, ifs_list, is_async
         )
@@ -1419,10 +1504,15 @@ class ASTConverter:
 
     # GeneratorExp(expr elt, comprehension* generators)
     def visit_GeneratorExp(self, n: ast3.GeneratorExp) -> GeneratorExpr:
-        targets = [self.visit(c.target) for c in n.generators]
-        iters = [self.visit(c.iter) for c in n.generators]
-        ifs_list = [self.translate_expr_list(c.ifs) for c in n.generators]
-        is_async = [bool(c.is_async) for c in n.generators]
+        targets: List[Expression] = []
+        iters: List[Expression] = []
+        ifs_list: List[List[Expression]] = []
+        is_async: List[bool] = []
+        for c in n.generators:
+            targets.append(self.visit(c.target))
+            iters.append(self.visit(c.iter))
+            ifs_list.append(self.translate_expr_list(c.ifs))
+            is_async.append(bool(c.is_async))
         e = GeneratorExpr(self.visit(n.elt), targets, iters, ifs_list, is_async)
         return self.set_line(e, n)
 
@@ -1434,7 +1524,7 @@ class ASTConverter:
 
     # Yield(expr? value)
     def visit_Yield(self, n: ast3.Yield) -> YieldExpr:
-        e = YieldExpr(self.visit(n.value))
+        e = YieldExpr(None if n.value is None else self.visit(n.value))
         return self.set_line(e, n)
 
     # YieldFrom(expr value)
@@ -1452,45 +1542,49 @@ class ASTConverter:
     # Call(expr func, expr* args, keyword* keywords)
     # keyword = (identifier? arg, expr value)
     def visit_Call(self, n: Call) -> CallExpr:
-        args = n.args
-        keywords = n.keywords
-        keyword_names = [k.arg for k in keywords]
-        arg_types = self.translate_expr_list(
-            [a.value if isinstance(a, Starred) else a for a in args] + [k.value for k in keywords]
-        )
-        arg_kinds = [ARG_STAR if type(a) is Starred else ARG_POS for a in args] + [
-            ARG_STAR2 if arg is None else ARG_NAMED for arg in keyword_names
-        ]
-        e = CallExpr(
-            self.visit(n.func),
-            arg_types,
-            arg_kinds,
-            cast("List[Optional[str]]", [None] * len(args)) + keyword_names,
-        )
+        arg_types: List[Expression] = []
+        arg_kinds: List[ArgKind] = []
+        arg_names: List[Optional[str]] = []
+        for a in n.args:
+            if type(a) is Starred:
+                arg_types.append(self.visit(a.value))
+                arg_kinds.append(ARG_STAR)
+            else:
+                arg_types.append(self.visit(a))
+                arg_kinds.append(ARG_POS)
+            arg_names.append(None)
+        for k in n.keywords:
+            arg_types.append(self.visit(k.value))
+            arg_kinds.append(ARG_STAR2 if k.arg is None else ARG_NAMED)
+            arg_names.append(k.arg)
+        e = CallExpr(self.visit(n.func), arg_types, arg_kinds, arg_names)
         return self.set_line(e, n)
 
     # Constant(object value) -- a constant, in Python 3.8.
     def visit_Constant(self, n: Constant) -> Any:
         val = n.value
+        # Constant values are always of an exact builtin type, so we can switch on
+        # type identity; the most common kinds of literals are checked first.
+        typ = type(val)
         e: Any = None
-        if val is None:
+        if typ is str:
+            e = StrExpr(val)
+        elif typ is int:
+            e = IntExpr(val)
+        elif val is None:
             e = NameExpr("None")
-        elif isinstance(val, str):
-            e = StrExpr(n.s)
-        elif isinstance(val, bytes):
-            e = BytesExpr(bytes_to_human_readable_repr(n.s))
-        elif isinstance(val, bool):  # Must check before int!
+        elif typ is bool:
             e = NameExpr(str(val))
-        elif isinstance(val, int):
-            e = IntExpr(val)
-        elif isinstance(val, float):
+        elif typ is float:
             e = FloatExpr(val)
-        elif isinstance(val, complex):
+        elif typ is bytes:
+            e = BytesExpr(bytes_to_human_readable_repr(val))
+        elif typ is complex:
             e = ComplexExpr(val)
         elif val is Ellipsis:
             e = EllipsisExpr()
         else:
-            raise RuntimeError("Constant not implemented for " + str(type(val)))
+            raise RuntimeError("Constant not implemented for " + str(typ))
         return self.set_line(e, n)
 
     # Num(object n) -- a number as a PyObject.
@@ -1519,18 +1613,27 @@ class ASTConverter:
     def visit_JoinedStr(self, n: ast3.JoinedStr) -> Expression:
         # Each of n.values is a str or FormattedValue; we just concatenate
         # them all using ''.join.
+        values = self.translate_expr_list(n.values)
+        # Don't make unnecessary join call if there is only one str to join
+        if len(values) == 1:
+            return self.set_line(values[0], n)
         empty_string = StrExpr("")
         empty_string.set_line(n.lineno, n.col_offset)
-        strs_to_join = ListExpr(self.translate_expr_list(n.values))
+        strs_to_join = ListExpr(values)
         strs_to_join.set_line(empty_string)
-        # Don't make unnecessary join call if there is only one str to join
-        if len(strs_to_join.items) == 1:
-            return self.set_line(strs_to_join.items[0], n)
         join_method = MemberExpr(empty_string, "join")
         join_method.set_line(empty_string)
         result_expression = CallExpr(join_method, [strs_to_join], [ARG_POS], [None])
         return self.set_line(result_expression, n)
 
+    # Format string templates for FormattedValue, keyed by conversion (-1 for none)
+    format_templates: Final[Dict[int, str]] = {
+        -1: "{:{}}",
+        ord("s"): "{!s:{}}",
+        ord("r"): "{!r:{}}",
+        ord("a"): "{!a:{}}",
+    }
+
     # FormattedValue(expr value)
     def visit_FormattedValue(self, n: ast3.FormattedValue) -> Expression:
         # A FormattedValue is a component of a JoinedStr, or it can exist
@@ -1539,8 +1642,11 @@ class ASTConverter:
         # to allow mypyc to support f-strings with format specifiers and conversions.
         val_exp = self.visit(n.value)
         val_exp.set_line(n.lineno, n.col_offset)
-        conv_str = "" if n.conversion is None or n.conversion < 0 else "!" + chr(n.conversion)
-        format_string = StrExpr("{" + conv_str + ":{}}")
+        conversion = -1 if n.conversion is None or n.conversion < 0 else n.conversion
+        format_template = ASTConverter.format_templates.get(conversion)
+        if format_template is None:
+            format_template = "{!" + chr(conversion) + ":{}}"
+        format_string = StrExpr(format_template)
         format_spec_exp = self.visit(n.format_spec) if n.format_spec is not None else StrExpr("")
         format_string.set_line(n.lineno, n.col_offset)
         format_method = MemberExpr(format_string, "format")
@@ -1570,24 +1676,29 @@ class ASTConverter:
         value = n.value
         member_expr = MemberExpr(self.visit(value), n.attr)
         obj = member_expr.expr
-        if (
-            isinstance(obj, CallExpr)
-            and isinstance(obj.callee, NameExpr)
-            and obj.callee.name == "super"
-        ):
-            e: Union[MemberExpr, SuperExpr] = SuperExpr(member_expr.name, obj)
-        else:
-            e = member_expr
-        return self.set_line(e, n)
+        if type(obj) is CallExpr:
+            callee = obj.callee
+            if type(callee) is NameExpr and callee.name == "super":
+                e = SuperExpr(member_expr.name, obj)
+                return self.set_line(e, n)
+        return self.set_line(member_expr, n)
 
     # Subscript(expr value, slice slice, expr_context ctx)
     def visit_Subscript(self, n: ast3.Subscript) -> IndexExpr:
-        e = IndexExpr(self.visit(n.value), self.visit(n.slice))
+        value = self.visit(n.value)
+        # Python 3.8 and earlier wrap a plain subscript in an Index node, so convert the
+        # wrapped expression directly. The 3.9+ stubs declare no fields on Index, hence
+        # Any; the type is compared separately so that sliceval isn't narrowed to Index.
+        sliceval: Any = n.slice
+        slice_type = type(sliceval)
+        if IS_PY38_OR_EARLIER and slice_type is Index:
+            index = self.visit(sliceval.value)
+        else:
+            index = self.visit(sliceval)
+        e = IndexExpr(value, index)
         self.set_line(e, n)
-        # alias to please mypyc
-        is_py38_or_earlier = sys.version_info < (3, 9)
         if isinstance(n.slice, ast3.Slice) or (
-            is_py38_or_earlier and isinstance(n.slice, ast3.ExtSlice)
+            IS_PY38_OR_EARLIER and isinstance(n.slice, ast3.ExtSlice)
         ):
             # Before Python 3.9, Slice has no line/column in the raw ast. To avoid incompatibility
             # visit_Slice doesn't set_line, even in Python 3.9 on.
@@ -1609,8 +1720,8 @@ class ASTConverter:
 
     # List(expr* elts, expr_context ctx)
     def visit_List(self, n: ast3.List) -> Union[ListExpr, TupleExpr]:
-        expr_list: List[Expression] = [self.visit(e) for e in n.elts]
-        if isinstance(n.ctx, ast3.Store):
+        expr_list = self.translate_expr_list(n.elts)
+        if type(n.ctx) is ast3.Store:
             # [x, y] = z and (x, y) = z means exactly the same thing
             e: Union[ListExpr, TupleExpr] = TupleExpr(expr_list)
         else:
@@ -1626,7 +1737,11 @@ class ASTConverter:
 
     # Slice(expr? lower, expr? upper, expr? step)
     def visit_Slice(self, n: ast3.Slice) -> SliceExpr:
-        return SliceExpr(self.visit(n.lower), self.visit(n.upper), self.visit(n.step))
+        return SliceExpr(
+            None if n.lower is None else self.visit(n.lower),
+            None if n.upper is None else self.visit(n.upper),
+            None if n.step is None else self.visit(n.step),
+        )
 
     # ExtSlice(slice* dims)
     def visit_ExtSlice(self, n: ast3.ExtSlice) -> TupleExpr:
@@ -1643,7 +1758,7 @@ class ASTConverter:
         node = MatchStmt(
             self.visit(n.subject),
             [self.visit(c.pattern) for c in n.cases],
-            [self.visit(c.guard) for c in n.cases],
+            [None if c.guard is None else self.visit(c.guard) for c in n.cases],
             [self.as_required_block(c.body, n.lineno) for c in n.cases],
         )
         return self.set_line(node, n)
@@ -1658,8 +1773,11 @@ class ASTConverter:
 
     def visit_MatchSequence(self, n: MatchSequence) -> SequencePattern:
         patterns = [self.visit(p) for p in n.patterns]
-        stars = [p for p in patterns if isinstance(p, StarredPattern)]
-        assert len(stars) < 2
+        star_count = 0
+        for p in patterns:
+            if isinstance(p, StarredPattern):
+                star_count += 1
+        assert star_count < 2
 
         node = SequencePattern(patterns)
         return self.set_line(node, n)
@@ -1710,6 +1828,30 @@ class ASTConverter:
         return self.set_line(node, n)
 
 
+def build_visitor_table(visitor: type) -> Dict[type, Callable[[Any, Any], Any]]:
+    """Map each AST node class to the visit_X method of visitor that handles it.
+
+    The methods are unbound, so the table can be built once at import time and
+    shared by all visitor instances instead of doing a getattr per node type.
+    """
+    # Deprecated node classes that the parser no longer produces are left out
+    skipped: Set[str] = set()
+    if sys.version_info >= (3, 8):
+        skipped.update(("Num", "Str", "Bytes", "NameConstant", "Ellipsis"))
+    if not IS_PY38_OR_EARLIER:
+        skipped.update(("Index", "ExtSlice"))
+    table: Dict[type, Callable[[Any, Any], Any]] = {}
+    for obj in vars(ast3).values():
+        if isinstance(obj, type) and issubclass(obj, AST) and obj.__name__ not in skipped:
+            method = getattr(visitor, "visit_" + obj.__name__, None)
+            if method is not None:
+                table[obj] = method
+    return table
+
+
+_AST_VISITORS: Final = build_visitor_table(ASTConverter)
+
+
 class TypeConverter:
     def __init__(
         self,
@@ -1721,7 +1863,6 @@ class TypeConverter:
         self.errors = errors
         self.line = line
         self.override_column = override_column
-        self.node_stack: List[AST] = []
         self.is_evaluated = is_evaluated
 
     def convert_column(self, column: int) -> int:
@@ -1745,9 +1886,13 @@ class TypeConverter:
 
         See RawExpressionType's docstring for more details on how it's used.
         """
-        return RawExpressionType(
-            None, "typing.Any", line=self.line, column=getattr(node, "col_offset", -1), note=note
-        )
+        if sys.version_info >= (3, 9):
+            # Only expression nodes are converted, and these always have a position
+            column = node.col_offset
+        else:
+            # Slice, Index and ExtSlice have no position information before 3.9
+            column = getattr(node, "col_offset", -1)
+        return RawExpressionType(None, "typing.Any", line=self.line, column=column, note=note)
 
     @overload
     def visit(self, node: ast3.expr) -> ProperType:
@@ -1758,25 +1903,13 @@ class TypeConverter:
         ...
 
     def visit(self, node: Optional[AST]) -> Optional[ProperType]:
-        """Modified visit -- keep track of the stack of nodes"""
         if node is None:
             return None
-        self.node_stack.append(node)
-        try:
-            method = "visit_" + node.__class__.__name__
-            visitor = getattr(self, method, None)
-            if visitor is not None:
-                return visitor(node)
-            else:
-                return self.invalid_type(node)
-        finally:
-            self.node_stack.pop()
-
-    def parent(self) -> Optional[AST]:
-        """Return the AST node above the one we are processing"""
-        if len(self.node_stack) < 2:
-            return None
-        return self.node_stack[-2]
+        visitor = _TYPE_VISITORS.get(type(node))
+        if visitor is not None:
+            return visitor(self, node)
+        else:
+            return self.invalid_type(node)
 
     def fail(self, msg: str, line: int, column: int) -> None:
         if self.errors:
@@ -1790,15 +1923,18 @@ class TypeConverter:
         return [self.visit(e) for e in l]
 
     def visit_Call(self, e: Call) -> Type:
+        # Arg constructors are only valid directly inside a list of argument types,
+        # which translate_argument_list() handles; any other call is an invalid type.
+        constructor = stringify_name(e.func)
+        note = None
+        if constructor:
+            note = "Suggestion: use {0}[...] instead of {0}(...)".format(constructor)
+        return self.invalid_type(e, note=note)
+
+    def translate_arg_constructor(self, e: Call) -> Type:
         # Parse the arg constructor
         f = e.func
         constructor = stringify_name(f)
-
-        if not isinstance(self.parent(), ast3.List):
-            note = None
-            if constructor:
-                note = "Suggestion: use {0}[...] instead of {0}(...)".format(constructor)
-            return self.invalid_type(e, note=note)
         if not constructor:
             self.fail("Expected arg constructor name", e.lineno, e.col_offset)
 
@@ -1847,12 +1983,24 @@ class TypeConverter:
         return CallableArgument(typ, name, constructor, e.lineno, e.col_offset)
 
     def translate_argument_list(self, l: Sequence[ast3.expr]) -> TypeList:
-        return TypeList([self.visit(e) for e in l], line=self.line)
+        return TypeList(
+            [self.translate_arg_constructor(e) if type(e) is Call else self.visit(e) for e in l],
+            line=self.line,
+        )
 
     def _extract_argument_name(self, n: ast3.expr) -> Optional[str]:
-        if isinstance(n, Str):
+        if sys.version_info >= (3, 8):
+            # Str and NameConstant are deprecated in 3.8+ and isinstance() checks
+            # against them inspect the value in Python code, so look at it directly
+            if type(n) is Constant:
+                value = n.value
+                if type(value) is str:
+                    return value.strip()
+                elif value is None:
+                    return None
+        elif type(n) is Str:
             return n.s.strip()
-        elif isinstance(n, NameConstant) and str(n.value) == "None":
+        elif type(n) is NameConstant and n.value is None:
             return None
         self.fail(
             "Expected string literal for argument name, got {}".format(type(n).__name__),
@@ -1865,7 +2013,7 @@ class TypeConverter:
         return UnboundType(n.id, line=self.line, column=self.convert_column(n.col_offset))
 
     def visit_BinOp(self, n: ast3.BinOp) -> Type:
-        if not isinstance(n.op, ast3.BitOr):
+        if type(n.op) is not ast3.BitOr:
             return self.invalid_type(n)
 
         left = self.visit(n.left)
@@ -1887,21 +2035,24 @@ class TypeConverter:
     # Only for 3.8 and newer
     def visit_Constant(self, n: Constant) -> Type:
         val = n.value
+        # Constant values are always of an exact builtin type (bool is checked
+        # separately from int), so we can switch on type identity.
+        typ = type(val)
+        if typ is str:
+            # Parse forward reference.
+            return parse_type_string(val, "builtins.str", self.line, n.col_offset)
         if val is None:
             # None is a type.
             return UnboundType("None", line=self.line)
-        if isinstance(val, str):
-            # Parse forward reference.
-            return parse_type_string(n.s, "builtins.str", self.line, n.col_offset)
+        if typ is int or typ is float or typ is complex:
+            return self.numeric_type(val, n)
         if val is Ellipsis:
             # '...' is valid in some types.
             return EllipsisType(line=self.line)
-        if isinstance(val, bool):
+        if typ is bool:
             # Special case for True/False.
             return RawExpressionType(val, "builtins.bool", line=self.line)
-        if isinstance(val, (int, float, complex)):
-            return self.numeric_type(val, n)
-        if isinstance(val, bytes):
+        if typ is bytes:
             contents = bytes_to_human_readable_repr(val)
             return RawExpressionType(contents, "builtins.bytes", self.line, column=n.col_offset)
         # Everything else is invalid.
@@ -1918,7 +2069,7 @@ class TypeConverter:
                 return typ
         return self.invalid_type(n)
 
-    def numeric_type(self, value: object, n: AST) -> Type:
+    def numeric_type(self, value: object, n: ast3.expr) -> Type:
         # The node's field has the type complex, but complex isn't *really*
         # a parent of int and float, and this causes isinstance below
         # to think that the complex branch is always picked. Avoid
@@ -1931,10 +2082,8 @@ class TypeConverter:
             # RawExpressionType so we just pass in 'None' for now. We'll report the
             # appropriate error at a later stage.
             numeric_value = None
-            type_name = f"builtins.{type(value).__name__}"
-        return RawExpressionType(
-            numeric_value, type_name, line=self.line, column=getattr(n, "col_offset", -1)
-        )
+            type_name = "builtins.float" if isinstance(value, float) else "builtins.complex"
+        return RawExpressionType(numeric_value, type_name, line=self.line, column=n.col_offset)
 
     # These next three methods are only used if we are on python <
     # 3.8, using typed_ast.  They are defined unconditionally because
@@ -1969,18 +2118,23 @@ class TypeConverter:
         elif isinstance(n.slice, ast3.Index):
             sliceval: Any = n.slice.value
         elif isinstance(n.slice, ast3.Slice):
-            sliceval = copy.deepcopy(n.slice)  # so we don't mutate passed AST
+            sliceval = n.slice
             if getattr(sliceval, "col_offset", None) is None:
-                # Fix column information so that we get Python 3.9+ message order
+                # Fix column information so that we get Python 3.9+ message order.
+                # Only the top-level node changes, so a shallow copy is enough to
+                # avoid mutating the passed AST.
+                sliceval = copy.copy(sliceval)
                 sliceval.col_offset = sliceval.lower.col_offset
         else:
             assert isinstance(n.slice, ast3.ExtSlice)
-            dims = copy.deepcopy(n.slice.dims)
-            for s in dims:
+            dims = list(n.slice.dims)
+            for i, s in enumerate(dims):
                 if getattr(s, "col_offset", None) is None:
                     if isinstance(s, ast3.Index):
+                        s = dims[i] = copy.copy(s)
                         s.col_offset = s.value.col_offset  # type: ignore
                     elif isinstance(s, ast3.Slice):
+                        s = dims[i] = copy.copy(s)
                         s.col_offset = s.lower.col_offset  # type: ignore
             sliceval = ast3.Tuple(dims, n.ctx)
 
@@ -2032,11 +2186,19 @@ class TypeConverter:
         return self.translate_argument_list(n.elts)
 
 
+_TYPE_VISITORS: Final = build_visitor_table(TypeConverter)
+
+
 def stringify_name(n: AST) -> Optional[str]:
-    if isinstance(n, Name):
+    # Walk down the attribute chain first so that the name is joined only once
+    attrs = []
+    while type(n) is Attribute:
+        attrs.append(n.attr)
+        n = n.value
+    if type(n) is not Name:
+        return None  # Can't do it.
+    if not attrs:
         return n.id
-    elif isinstance(n, Attribute):
-        sv = stringify_name(n.value)
-        if sv is not None:
-            return f"{sv}.{n.attr}"
-    return None  # Can't do it.
+    attrs.append(n.id)
+    attrs.reverse()
+    return ".".join(attrs)
@@ -1,6 +1,6 @@
 """Calculation of the least upper bound types (joins)."""
 
-from typing import List, Optional, Tuple
+from typing import List, Optional, Set, Tuple
 
 import mypy.typeops
 from mypy.maptype import map_instance_to_supertype
@@ -42,22 +42,31 @@ from mypy.types import (
     UnionType,
     UnpackType,
     get_proper_type,
-    get_proper_types,
 )
 
 
 class InstanceJoiner:
+    __slots__ = ("seen_instances",)
+
     def __init__(self) -> None:
-        self.seen_instances: List[Tuple[Instance, Instance]] = []
+        # Pairs of instances currently being joined, used to break cycles. Instances
+        # hash by value (and cache their hash), so membership tests are cheap.
+        self.seen_instances: Set[Tuple[Instance, Instance]] = set()
 
     def join_instances(self, t: Instance, s: Instance) -> ProperType:
-        if (t, s) in self.seen_instances or (s, t) in self.seen_instances:
+        if t.type is s.type and not t.args and not s.args:
+            # Two instances of the same non-generic class: there are no arguments to
+            # combine and nothing to recurse into, so skip the cycle bookkeeping.
+            return Instance(t.type, [])
+
+        pair = (t, s)
+        if pair in self.seen_instances or (s, t) in self.seen_instances:
             return object_from_instance(t)
 
-        self.seen_instances.append((t, s))
+        self.seen_instances.add(pair)
 
         # Calculate the join of two instance types
-        if t.type == s.type:
+        if t.type is s.type:
             # Simplest case: join two types with the same base type (but
             # potentially different arguments).
 
@@ -77,23 +86,24 @@ class InstanceJoiner:
                     if type_var.variance == COVARIANT:
                         new_type = join_types(ta, sa, self)
                         if len(type_var.values) != 0 and new_type not in type_var.values:
-                            self.seen_instances.pop()
+                            self.seen_instances.discard(pair)
                             return object_from_instance(t)
                         if not is_subtype(new_type, type_var.upper_bound):
-                            self.seen_instances.pop()
+                            self.seen_instances.discard(pair)
                             return object_from_instance(t)
                     # TODO: contravariant case should use meet but pass seen instances as
                     # an argument to keep track of recursive checks.
                     elif type_var.variance in (INVARIANT, CONTRAVARIANT):
-                        if not is_equivalent(ta, sa):
-                            self.seen_instances.pop()
+                        # Identical arguments are trivially equivalent
+                        if ta is not sa and not is_equivalent(ta, sa):
+                            self.seen_instances.discard(pair)
                             return object_from_instance(t)
                         # If the types are different but equivalent, then an Any is involved
                         # so using a join in the contravariant case is also OK.
                         new_type = join_types(ta, sa, self)
                 else:
                     # ParamSpec type variables behave the same, independent of variance
-                    if not is_equivalent(ta, sa):
+                    if ta is not sa and not is_equivalent(ta, sa):
                         return get_proper_type(type_var.upper_bound)
                     new_type = join_types(ta, sa, self)
                 assert new_type is not None
@@ -107,13 +117,14 @@ class InstanceJoiner:
             # in of the both cases.
             result = self.join_instances_via_supertype(s, t)
 
-        self.seen_instances.pop()
+        self.seen_instances.discard(pair)
         return result
 
     def join_instances_via_supertype(self, t: Instance, s: Instance) -> ProperType:
         # Give preference to joins via duck typing relationship, so that
         # join(int, float) == float, for example.
-        for p in t.type._promote:
+        t_promote = t.type._promote
+        for p in t_promote:
             if is_subtype(p, s):
                 return join_types(p, s, self)
         for p in s.type._promote:
@@ -130,7 +141,7 @@ class InstanceJoiner:
             if best is None or is_better(res, best):
                 best = res
         assert best is not None
-        for promote in t.type._promote:
+        for promote in t_promote:
             promote = get_proper_type(promote)
             if isinstance(promote, Instance):
                 res = self.join_instances(promote, s)
@@ -151,6 +162,10 @@ def join_simple(declaration: Optional[Type], s: Type, t: Type) -> ProperType:
         s = mypy.typeops.true_or_false(s)
         t = mypy.typeops.true_or_false(t)
 
+    if s is t:
+        # Every type is a proper subtype of itself
+        return s
+
     if isinstance(s, AnyType):
         return s
 
@@ -181,7 +196,7 @@ def join_simple(declaration: Optional[Type], s: Type, t: Type) -> ProperType:
 
 def trivial_join(s: Type, t: Type) -> ProperType:
     """Return one of types (expanded) if it is a supertype of other, otherwise top type."""
-    if is_subtype(s, t):
+    if s is t or is_subtype(s, t):
         return get_proper_type(t)
     elif is_subtype(t, s):
         return get_proper_type(s)
@@ -347,8 +362,8 @@ class TypeJoinVisitor(TypeVisitor[ProperType]):
             ):
                 result.from_type_type = True
             if any(
-                isinstance(tp, (NoneType, UninhabitedType))
-                for tp in get_proper_types(result.arg_types)
+                isinstance(get_proper_type(tp), (NoneType, UninhabitedType))
+                for tp in result.arg_types
             ):
                 # We don't want to return unusable Callable, attempt fallback instead.
                 return join_types(t.fallback, self.s)
@@ -434,30 +449,29 @@ class TypeJoinVisitor(TypeVisitor[ProperType]):
                 mypy.typeops.tuple_fallback(self.s), mypy.typeops.tuple_fallback(t)
             )
             assert isinstance(fallback, Instance)
-            if self.s.length() == t.length():
-                items: List[Type] = []
-                for i in range(t.length()):
-                    items.append(self.join(t.items[i], self.s.items[i]))
-                return TupleType(items, fallback)
-            else:
-                return fallback
+            items: List[Type] = []
+            for t_item, s_item in zip(t.items, self.s.items):
+                items.append(join_types(t_item, s_item))
+            return TupleType(items, fallback)
         else:
             return join_types(self.s, mypy.typeops.tuple_fallback(t))
 
     def visit_typeddict_type(self, t: TypedDictType) -> ProperType:
         if isinstance(self.s, TypedDictType):
+            t_required_keys = t.required_keys
+            s_required_keys = self.s.required_keys
             items = {
                 item_name: s_item_type
                 for (item_name, s_item_type, t_item_type) in self.s.zip(t)
                 if (
                     is_equivalent(s_item_type, t_item_type)
-                    and (item_name in t.required_keys) == (item_name in self.s.required_keys)
+                    and (item_name in t_required_keys) == (item_name in s_required_keys)
                 )
             }
             fallback = self.s.create_anonymous_fallback()
             # We need to filter by items.keys() since some required keys present in both t and
             # self.s might be missing from the join if the types are incompatible.
-            required_keys = set(items.keys()) & t.required_keys & self.s.required_keys
+            required_keys = items.keys() & t_required_keys & s_required_keys
             return TypedDictType(items, required_keys, fallback)
         elif isinstance(self.s, Instance):
             return join_types(self.s, t.fallback)
@@ -598,16 +612,12 @@ def combine_arg_names(t: CallableType, s: CallableType) -> List[Optional[str]]:
 
     Precondition: is_similar_types(t, s) is true.
     """
-    num_args = len(t.arg_types)
-    new_names = []
-    for i in range(num_args):
-        t_name = t.arg_names[i]
-        s_name = s.arg_names[i]
-        if t_name == s_name or t.arg_kinds[i].is_named() or s.arg_kinds[i].is_named():
-            new_names.append(t_name)
-        else:
-            new_names.append(None)
-    return new_names
+    return [
+        t_name if t_name == s_name or t_kind.is_named() or s_kind.is_named() else None
+        for t_name, s_name, t_kind, s_kind in zip(
+            t.arg_names, s.arg_names, t.arg_kinds, s.arg_kinds
+        )
+    ]
 
 
 def object_from_instance(instance: Instance) -> Instance:
@@ -652,6 +662,6 @@ def join_type_list(types: List[Type]) -> ProperType:
 
 def unpack_callback_protocol(t: Instance) -> Optional[Type]:
     assert t.type.is_protocol
-    if t.type.protocol_members == ["__call__"]:
+    if t.type.is_callback_protocol:
         return find_member("__call__", t, t, is_operator=True)
     return None
@@ -2892,6 +2892,19 @@ class TypeInfo(SymbolNode):
                     members.add(name)
         return sorted(list(members))
 
+    @property
+    def is_callback_protocol(self) -> bool:
+        # Same as protocol_members == ["__call__"], but stops at the first other member.
+        assert self.mro, "This property can be only accessed after MRO is (re-)calculated"
+        found = False
+        for base in self.mro[:-1]:  # we skip "object" since everyone implements it
+            if base.is_protocol:
+                for name in base.names:
+                    if name != "__call__":
+                        return False
+                    found = True
+        return found
+
     def __getitem__(self, name: str) -> "SymbolTableNode":
         n = self.get(name)
         if n:
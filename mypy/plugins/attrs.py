@@ -65,17 +65,30 @@ from mypy.typevars import fill_typevars
 from mypy.util import unmangle
 
 # The names of the different functions that create classes or arguments.
-attr_class_makers: Final = {"attr.s", "attr.attrs", "attr.attributes"}
-attr_dataclass_makers: Final = {"attr.dataclass"}
-attr_frozen_makers: Final = {"attr.frozen", "attrs.frozen"}
-attr_define_makers: Final = {"attr.define", "attr.mutable", "attrs.define", "attrs.mutable"}
-attr_attrib_makers: Final = {"attr.ib", "attr.attrib", "attr.attr", "attr.field", "attrs.field"}
-attr_optional_converters: Final = {"attr.converters.optional", "attrs.converters.optional"}
+attr_class_makers: Final = frozenset({"attr.s", "attr.attrs", "attr.attributes"})
+attr_dataclass_makers: Final = frozenset({"attr.dataclass"})
+attr_frozen_makers: Final = frozenset({"attr.frozen", "attrs.frozen"})
+attr_define_makers: Final = frozenset(
+    {"attr.define", "attr.mutable", "attrs.define", "attrs.mutable"}
+)
+attr_attrib_makers: Final = frozenset(
+    {"attr.ib", "attr.attrib", "attr.attr", "attr.field", "attrs.field"}
+)
+attr_optional_converters: Final = frozenset(
+    {"attr.converters.optional", "attrs.converters.optional"}
+)
+# All decorators that turn a class into an attrs class, for a single membership test.
+attr_all_class_makers: Final = (
+    attr_class_makers | attr_dataclass_makers | attr_frozen_makers | attr_define_makers
+)
 
 SELF_TVAR_NAME: Final = "_AT"
 MAGIC_ATTR_NAME: Final = "__attrs_attrs__"
 MAGIC_ATTR_CLS_NAME: Final = "_AttrsAttributes"  # The namedtuple subclass name.
 
+# __init__ argument kinds indexed by [kw_only][has_default].
+_ARG_KIND_TABLE: Final = ((ARG_POS, ARG_OPT), (ARG_NAMED, ARG_NAMED_OPT))
+
 
 class Converter:
     """Holds information about a `converter=` argument"""
@@ -141,10 +154,7 @@ class Attribute:
             assert node is not None
             ctx.api.msg.need_annotation_for_var(node, self.context)
 
-        if self.kw_only:
-            arg_kind = ARG_NAMED_OPT if self.has_default else ARG_NAMED
-        else:
-            arg_kind = ARG_OPT if self.has_default else ARG_POS
+        arg_kind = _ARG_KIND_TABLE[self.kw_only][self.has_default]
 
         # Attrs removes leading underscores when creating the __init__ arguments.
         return Argument(Var(self.name.lstrip("_"), init_type), init_type, None, arg_kind)
@@ -300,6 +310,7 @@ def attr_class_maker_callback(
     attributes = _analyze_class(ctx, auto_attribs, kw_only)
 
     # Check if attribute types are ready.
+    attr_types: List[Tuple[str, Optional[Type]]] = []
     for attr in attributes:
         node = info.get(attr.name)
         if node is None:
@@ -307,8 +318,9 @@ def attr_class_maker_callback(
             # should have been reported already.
             _add_empty_metadata(info)
             return True
+        attr_types.append((attr.name, node.type))
 
-    _add_attrs_magic_attribute(ctx, [(attr.name, info[attr.name].type) for attr in attributes])
+    _add_attrs_magic_attribute(ctx, attr_types)
     if slots:
         _add_slots(ctx, attributes)
     if match_args and ctx.api.options.python_version[:2] >= (3, 10):
@@ -339,7 +351,8 @@ def _get_frozen(ctx: "mypy.plugin.ClassDefContext", frozen_default: bool) -> boo
         return True
     # Subclasses of frozen classes are frozen so check that.
     for super_info in ctx.cls.info.mro[1:-1]:
-        if "attrs" in super_info.metadata and super_info.metadata["attrs"]["frozen"]:
+        attrs_metadata = super_info.metadata.get("attrs")
+        if attrs_metadata is not None and attrs_metadata["frozen"]:
             return True
     return False
 
@@ -374,8 +387,9 @@ def _analyze_class(
     for attribute in own_attrs.values():
         # Even though these look like class level assignments we want them to look like
         # instance level assignments.
-        if attribute.name in ctx.cls.info.names:
-            node = ctx.cls.info.names[attribute.name].node
+        sym = ctx.cls.info.names.get(attribute.name)
+        if sym is not None:
+            node = sym.node
             if isinstance(node, PlaceholderNode):
                 # This node is not ready yet.
                 continue
@@ -386,11 +400,12 @@ def _analyze_class(
     taken_attr_names = set(own_attrs)
     super_attrs = []
     for super_info in ctx.cls.info.mro[1:-1]:
-        if "attrs" in super_info.metadata:
+        attrs_metadata = super_info.metadata.get("attrs")
+        if attrs_metadata is not None:
             # Each class depends on the set of attributes in its attrs ancestors.
             ctx.api.add_plugin_dependency(make_wildcard_trigger(super_info.fullname))
 
-            for data in super_info.metadata["attrs"]["attributes"]:
+            for data in attrs_metadata["attributes"]:
                 # Only add an attribute if it hasn't been defined before.  This
                 # allows for overwriting attribute definitions by subclassing.
                 if data["name"] not in taken_attr_names:
@@ -434,7 +449,8 @@ def _detect_auto_attribs(ctx: "mypy.plugin.ClassDefContext") -> bool:
     It's disabled if there are any unannotated attribs()
     """
     for stmt in ctx.cls.defs.body:
-        if isinstance(stmt, AssignmentStmt):
+        # Annotated assignments are fine either way, so only the others need parsing.
+        if isinstance(stmt, AssignmentStmt) and not stmt.new_syntax:
             for lvalue in stmt.lvalues:
                 lvalues, rvalues = _parse_assignments(lvalue, stmt)
 
@@ -446,10 +462,9 @@ def _detect_auto_attribs(ctx: "mypy.plugin.ClassDefContext") -> bool:
                 for lhs, rvalue in zip(lvalues, rvalues):
                     # Check if the right hand side is a call to an attribute maker.
                     if (
-                        isinstance(rvalue, CallExpr)
+                        type(rvalue) is CallExpr
                         and isinstance(rvalue.callee, RefExpr)
                         and rvalue.callee.fullname in attr_attrib_makers
-                        and not stmt.new_syntax
                     ):
                         # This means we have an attrib without an annotation and so
                         # we can't do auto_attribs=True
@@ -481,7 +496,7 @@ def _attributes_from_assignment(
         for lhs, rvalue in zip(lvalues, rvalues):
             # Check if the right hand side is a call to an attribute maker.
             if (
-                isinstance(rvalue, CallExpr)
+                type(rvalue) is CallExpr
                 and isinstance(rvalue.callee, RefExpr)
                 and rvalue.callee.fullname in attr_attrib_makers
             ):
@@ -697,14 +712,16 @@ def _parse_assignments(
     """Convert a possibly complex assignment expression into lists of lvalues and rvalues."""
     lvalues: List[NameExpr] = []
     rvalues: List[Expression] = []
-    if isinstance(lvalue, (TupleExpr, ListExpr)):
-        if all(isinstance(item, NameExpr) for item in lvalue.items):
-            lvalues = cast(List[NameExpr], lvalue.items)
-        if isinstance(stmt.rvalue, (TupleExpr, ListExpr)):
-            rvalues = stmt.rvalue.items
-    elif isinstance(lvalue, NameExpr):
+    # Check the common single-name case first; none of these node classes are subclassed.
+    if type(lvalue) is NameExpr:
         lvalues = [lvalue]
         rvalues = [stmt.rvalue]
+    elif type(lvalue) is TupleExpr or type(lvalue) is ListExpr:
+        if all(type(item) is NameExpr for item in lvalue.items):
+            lvalues = cast(List[NameExpr], lvalue.items)
+        rvalue = stmt.rvalue
+        if type(rvalue) is TupleExpr or type(rvalue) is ListExpr:
+            rvalues = rvalue.items
     return lvalues, rvalues
 
 
@@ -732,9 +749,10 @@ def _add_order(ctx: "mypy.plugin.ClassDefContext", adder: "MethodAdder") -> None
 def _make_frozen(ctx: "mypy.plugin.ClassDefContext", attributes: List[Attribute]) -> None:
     """Turn all the attributes into properties to simulate frozen classes."""
     for attribute in attributes:
-        if attribute.name in ctx.cls.info.names:
+        sym = ctx.cls.info.names.get(attribute.name)
+        if sym is not None:
             # This variable belongs to this class so we can modify it.
-            node = ctx.cls.info.names[attribute.name].node
+            node = sym.node
             assert isinstance(node, Var)
             node.is_property = True
         else:
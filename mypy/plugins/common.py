@@ -66,7 +66,8 @@ def _get_argument(call: CallExpr, name: str) -> Optional[Expression]:
     #
     # Note: I'm not hard-coding the index so that in the future we can support other
     # attrib and class makers.
-    if not isinstance(call.callee, RefExpr):
+    if not call.args or not isinstance(call.callee, RefExpr):
+        # Nothing was passed (e.g. a bare `attr.ib()`), so skip resolving the callee.
         return None
 
     callee_type = None
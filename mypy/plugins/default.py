@@ -115,12 +115,7 @@ class DefaultPlugin(Plugin):
         # in the MRO.
         if fullname in dataclasses.dataclass_makers:
             return dataclasses.dataclass_tag_callback
-        if (
-            fullname in attrs.attr_class_makers
-            or fullname in attrs.attr_dataclass_makers
-            or fullname in attrs.attr_frozen_makers
-            or fullname in attrs.attr_define_makers
-        ):
+        if fullname in attrs.attr_all_class_makers:
             return attrs.attr_tag_callback
 
         return None
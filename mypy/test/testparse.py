@@ -6,10 +6,17 @@ from pytest import skip
 
 from mypy import defaults
 from mypy.errors import CompileError
+from mypy.fastparse import parse_type_comment, parse_type_comment_ast
 from mypy.options import Options
 from mypy.parse import parse
 from mypy.test.data import DataDrivenTestCase, DataSuite
-from mypy.test.helpers import assert_string_arrays_equal, find_test_files, parse_options
+from mypy.test.helpers import Suite, assert_string_arrays_equal, find_test_files, parse_options
+from mypy.types import UnboundType
+
+if sys.version_info >= (3, 8):
+    from ast import walk
+else:
+    from typed_ast.ast3 import walk
 
 
 class ParserSuite(DataSuite):
@@ -88,3 +95,42 @@ def test_parse_error(testcase: DataDrivenTestCase) -> None:
             e.messages,
             f"Invalid compiler output ({testcase.file}, line {testcase.line})",
         )
+
+
+class TypeCommentCacheSuite(Suite):
+    def test_cached_type_comment_results_are_independent(self) -> None:
+        comment = "Dict[str, Tuple[int, 1:2]]"
+        _, first = parse_type_comment(comment, line=1, column=0, errors=None)
+        _, second = parse_type_comment(comment, line=7, column=4, errors=None)
+        assert isinstance(first, UnboundType)
+        assert isinstance(second, UnboundType)
+        assert first is not second
+        assert (first.line, first.column) == (1, 0)
+        assert (second.line, second.column) == (7, 4)
+
+        # Mutating one result must not affect the other.
+        first.optional = True
+        first.args[0].line = 100
+        assert not second.optional
+        assert second.args[0].line == 7
+
+    def test_slice_column_fixup_leaves_cached_tree_unchanged(self) -> None:
+        if sys.version_info >= (3, 9):
+            skip("Slice columns are only fixed up before Python 3.9")
+        # A bare slice and an extended slice take different fix-up paths.
+        for comment in ("Tuple[1:2]", "Tuple[int, 1:2]"):
+            tree = parse_type_comment_ast(comment)
+            slices = [
+                node
+                for node in walk(tree)
+                if type(node).__name__ in ("Index", "Slice", "ExtSlice")
+            ]
+            assert slices
+            dims = [list(getattr(node, "dims", [])) for node in slices]
+            columns = [getattr(node, "col_offset", None) for node in slices]
+
+            parse_type_comment(comment, line=1, column=0, errors=None)
+
+            assert parse_type_comment_ast(comment) is tree
+            assert [list(getattr(node, "dims", [])) for node in slices] == dims
+            assert [getattr(node, "col_offset", None) for node in slices] == columns
@@ -5,7 +5,7 @@ from typing import List, Tuple
 from mypy.erasetype import erase_type, remove_instance_last_known_values
 from mypy.expandtype import expand_type
 from mypy.indirection import TypeIndirectionVisitor
-from mypy.join import join_simple, join_types
+from mypy.join import join_simple, join_type_list, join_types
 from mypy.meet import meet_types, narrow_declared_type
 from mypy.nodes import ARG_OPT, ARG_POS, ARG_STAR, ARG_STAR2, CONTRAVARIANT, COVARIANT, INVARIANT
 from mypy.state import state
@@ -937,10 +937,32 @@ class JoinSuite(Suite):
             UnionType([lit2, lit3]), UnionType([lit1, lit2]), UnionType([lit2, lit3, lit1])
         )
 
+    def test_join_type_list_repeated_items(self) -> None:
+        # Joins are neither associative nor idempotent here, so repeating an item
+        # (even the same object) can change the result of the left fold.
+        fx = self.fx
+        self.assert_join_type_list(
+            [fx.gdyn, fx.go, UnionType([fx.a, fx.d]), fx.lit3, fx.go],
+            "Union[G[builtins.object], G[Any], A, D]",
+        )
+        self.assert_join_type_list(
+            [fx.gdyn, fx.ga, UnionType([fx.b, fx.nonet]), fx.ga], "Union[G[A], G[Any], B]"
+        )
+        self.assert_join_type_list([fx.lit2_inst, fx.lit2_inst, UnionType([fx.b, fx.nonet])], "A")
+        self.assert_join_type_list([fx.lit1_inst, fx.lit1_inst], "A")
+
     # There are additional test cases in check-inference.test.
 
     # TODO: Function types + varargs and default args.
 
+    def assert_join_type_list(self, types: List[Type], join: str) -> None:
+        result = join_type_list(types)
+        expected = get_proper_type(types[0])
+        for t in types[1:]:
+            expected = join_types(expected, t)
+        assert_equal(str(result), str(expected))
+        assert_equal(str(result), join)
+
     def assert_join(self, s: Type, t: Type, join: Type) -> None:
         self.assert_simple_join(s, t, join)
         self.assert_simple_join(t, s, join)